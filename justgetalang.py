@@ -20,9 +20,14 @@ Contributing:
 '''
 
 import os
+import re
 import sys
 import json
+import atexit
+import asyncio
+import inspect
 import platform
+import functools
 
 usageStr = '''
 -------------------------------- USAGE --------------------------------
@@ -35,12 +40,18 @@ option as shown in the example(s).
 Specify a language that exists in the {lang} directory under the
 current directory.
 
+Add --verbose to show each line and chunk as it is processed.
+
 Example:
   ./justgetalang.py --from de --to en
 '''
 
 verbosity = 0
 enable_web_cache = True
+max_concurrent_requests = 8
+# ^ Limit simultaneous requests to Google Translate to avoid being
+#   blocked for too many requests.
+max_request_attempts = 3
 
 
 def echo0(*args, **kwargs):
@@ -57,10 +68,24 @@ def echo1(*args, **kwargs):
 trCache = {}
 trCachePath = 'trCache.json'
 if os.path.isfile(trCachePath):
-    with open(trCachePath) as ins:
+    with open(trCachePath, 'r', encoding='utf-8') as ins:
         trCache = json.load(ins)
 
 
+def saveTrCache():
+    '''
+    Save trCache to trCachePath so later runs don't translate the same
+    values again.
+    '''
+    tmpPath = trCachePath + ".tmp"
+    with open(tmpPath, 'w', encoding='utf-8') as outs:
+        json.dump(trCache, outs, sort_keys=True, indent=2)
+    os.replace(tmpPath, trCachePath)
+    # ^ Replace the old cache only after the new one is complete, so
+    #   the cache isn't lost if the program is stopped while saving.
+    echo0("INFO: The cache was saved to \"{}\"".format(trCachePath))
+
+
 def bugHelp():
     echo0("--- INSTALL ---")
     echo0("You must install googletrans such as via:")
@@ -116,26 +141,185 @@ except ModuleNotFoundError:
 from googletrans import Translator
 
 translator = Translator()
+translator_is_async = inspect.iscoroutinefunction(translator.translate)
+# ^ googletrans 4.0.1 or later is asynchronous (See _requestTranslation).
 
 
 def _translate(value, fromLang, toLang):
     '''
     Translate value to toLang.
     '''
-    echo1("  *translate chunk* " + value)
+    return _translateList([value], fromLang, toLang)[0]
+
+
+def isTranslatorLang(lang):
+    '''
+    Determine True or False: whether googletrans accepts lang as a
+    source or destination language. Like googletrans, ignore case and
+    any dialect after "_" (such as "en_US").
+    '''
+    code = lang.lower().split("_", 1)[0]
+    if code in googletrans.LANGUAGES:
+        return True
+    if code in getattr(googletrans, 'LANGCODES', {}):
+        return True
+    constants = getattr(googletrans, 'constants', None)
+    if code in getattr(constants, 'SPECIAL_CASES', {}):
+        return True
+    return False
+
+
+def isBrokenParser(ex):
+    '''
+    Determine True or False: whether the AttributeError ex is the
+    googletrans bug that bugHelp explains (rather than a failed
+    request).
+    '''
+    return "NoneType" in str(ex)
+
+
+async def _requestTranslation(value, fromLang, toLang):
+    '''
+    Send one request to the translator and return the result object.
+    '''
+    if translator_is_async:
+        return await translator.translate(value, src=fromLang,
+                                          dest=toLang)
+    # googletrans 4.0.0rc1 blocks, so wait for it in a thread.
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None,
+        functools.partial(translator.translate, value,
+                          src=fromLang, dest=toLang),
+    )
+
+
+async def _translateAsync(value, fromLang, toLang, semaphore,
+                          cache=None):
+    '''
+    Translate value to toLang once semaphore allows another request.
+    If the request fails, try again after waiting (1 second then 2
+    seconds and so on) up to max_request_attempts in total, such as in
+    case Google Translate is refusing too many requests.
+
+    Keyword arguments:
+    cache -- If not None, store the translation in this dict as soon as
+             it arrives (so it is kept even if another request fails).
+    '''
+    async with semaphore:
+        echo1("  *translate chunk* " + value)
+        attempt = 1
+        while True:
+            try:
+                result = await _requestTranslation(value, fromLang,
+                                                   toLang)
+                break
+            except ValueError:
+                # such as an invalid source or destination language
+                # (Trying again can't help).
+                raise
+            except Exception as ex:
+                if isinstance(ex, AttributeError) and isBrokenParser(ex):
+                    # It is not a network error (See bugHelp).
+                    raise
+                # ^ Retry other errors, including the AttributeError
+                #   about raise_Exception that googletrans 4.0.0rc1
+                #   raises for any status other than 200 (such as 429).
+                if attempt >= max_request_attempts:
+                    raise
+                delay = 2 ** (attempt - 1)
+                echo0("WARNING: Translating \"{}\" failed ({}: {})."
+                      " Trying again in {}s..."
+                      "".format(value, type(ex).__name__, ex, delay))
+                await asyncio.sleep(delay)
+                attempt += 1
+    if cache is not None:
+        cache[value] = result.text
+    return result.text
+
+
+async def _gatherTranslations(values, fromLang, toLang, cache):
+    semaphore = asyncio.Semaphore(max_concurrent_requests)
+    return await asyncio.gather(*[
+        _translateAsync(value, fromLang, toLang, semaphore, cache=cache)
+        for value in values
+    ])
+
+
+def _translateList(values, fromLang, toLang, cache=None):
+    '''
+    Translate a list of values to toLang with up to
+    max_concurrent_requests requests in flight at once, and return the
+    list of translations in the same order.
+
+    Keyword arguments:
+    cache -- If not None, store each translation in this dict as soon as
+             it arrives.
+    '''
     try:
-        result = translator.translate(value, dest=toLang)
-        value = result.text
+        return asyncio.run(_gatherTranslations(values, fromLang, toLang,
+                                               cache))
     except AttributeError as ex:
-        if "NoneType" in str(ex):
+        if isBrokenParser(ex):
             bugHelp()
             sys.exit(1)
+        elif "raise_Exception" in str(ex):
+            echo0("ERROR: Google Translate refused the request"
+                  " {} time(s) (googletrans shows this as \"{}\")."
+                  " Try again later."
+                  "".format(max_request_attempts, ex))
+            sys.exit(1)
         else:
             raise ex
-    return value
 
 
-builtins_en_done = {}
+# The game-related
+andrzuk_games = (
+    'Demo',
+    'Score:',
+    'Scores List',
+    'Speed:',
+    'Super fast (20x)',
+    'Very fast (10x)',
+    'Faster (5x)',
+    'Little faster (4x)',
+    'Medium (3x)',
+    'Slow (2x)',
+    'Very slow (1x)',
+    'Play',
+    'Pause',
+    'Map editor',
+    'Canvas is not supported in your browser.',
+    'Start',
+    'Keyboard control:',
+    'Rotation:',
+    'PageUp',
+    'PageDown',
+    'Move:',
+    'Left',
+    'Right',
+    'Down',
+    'Drop:',
+    'Space bar',
+    'Space Bar',
+    'Save &amp; Exit',
+    'Save &amp; exit',
+    'Close',
+    'Tetris Maps Editor',
+    '-180 days',
+)
+sames = (
+    'http',
+    'https',
+    'Mail Manager',
+)
+# TODO: Handle sub-parts such as in "-180 days"
+# TODO: handle different capitalization and preserve case.
+builtins_en = {same: same for same in andrzuk_games + sames}
+# ^ Copy these English words as-is (See build_builtins_en).
+
+builtins_en_done = set()
+# ^ (fromLang, toLang) pairs that build_builtins_en already filled
 
 
 def build_builtins_en(fromLang, toLang):
@@ -150,86 +334,102 @@ def build_builtins_en(fromLang, toLang):
               overwrites parts with English, toLang should be en,
               en_US, en_GB or some other English dialect.
     '''
-    if trCache.get(fromLang) is None:
-        trCache[fromLang] = {}
-    if trCache[fromLang].get(toLang) is None:
-        trCache[fromLang][toLang] = {}
-    # The game-related
-    andrzuk_games = [
-        'Demo',
-        'Score:',
-        'Scores List',
-        'Speed:',
-        'Super fast (20x)',
-        'Very fast (10x)',
-        'Faster (5x)',
-        'Little faster (4x)',
-        'Medium (3x)',
-        'Slow (2x)',
-        'Very slow (1x)',
-        'Play',
-        'Pause',
-        'Map editor',
-        'Canvas is not supported in your browser.',
-        'Start',
-        'Keyboard control:',
-        'Rotation:',
-        'PageUp',
-        'PageDown',
-        'Move:',
-        'Left',
-        'Right',
-        'Down',
-        'Drop:',
-        'Space bar',
-        'Space Bar',
-        'Save &amp; Exit',
-        'Save &amp; exit',
-        'Close',
-        'Tetris Maps Editor',
-        '-180 days',
-    ]
-    for same in andrzuk_games:
-        trCache[fromLang][toLang][same] = same
-
-    sames = [
-        'http',
-        'https',
-        'Mail Manager',
-    ]
-    # TODO: Handle sub-parts such as in "-180 days"
-    # TODO: handle different capitalization and preserve case.
-    for same in sames:
-        trCache[fromLang][toLang][same] = same
-
-    builtins_en_done[fromLang] = True
+    cache = trCache.setdefault(fromLang, {}).setdefault(toLang, {})
+    cache.update(builtins_en)
+    builtins_en_done.add((fromLang, toLang))
 
 
-def translateCached(value, fromLang, toLang):
-    rawV = value
-    value = value.lstrip()
-    preSpace = rawV[:len(rawV)-len(value)]
-    postSpace = ""
-    postSpaceLen = len(rawV) - len(rawV.rstrip())
-    if postSpaceLen > 0:
-        postSpace = rawV[-postSpaceLen:]
-    value = value.rstrip()
-    if trCache.get(fromLang) is None:
-        trCache[fromLang] = {}
-    if trCache[fromLang].get(toLang) is None:
-        trCache[fromLang][toLang] = {}
-    if (toLang == "en") or (toLang.startswith("en_")):
-        if not builtins_en_done.get(fromLang) is True:
+def _getTrCache(fromLang, toLang):
+    '''
+    Get the dict of cached translations from fromLang to toLang,
+    creating it (and the built-in English entries if toLang is English)
+    if necessary.
+    '''
+    cache = trCache.setdefault(fromLang, {}).setdefault(toLang, {})
+    if (fromLang, toLang) not in builtins_en_done:
+        if (toLang == "en") or (toLang.startswith("en_")):
             build_builtins_en(fromLang, toLang)
-    got = trCache[fromLang][toLang].get(value)
+    return cache
+
+
+def splitSpacing(rawV):
+    '''
+    Split rawV into the leading whitespace, the value, and the trailing
+    whitespace (so the value can be translated without the spacing).
+    '''
+    value = rawV.strip()
+    if value is rawV:
+        # ^ strip returns the same string if there is no spacing.
+        return "", value, ""
+    if not value:
+        return rawV, value, ""
+    start = rawV.find(value)
+    return rawV[:start], value, rawV[start+len(value):]
+
+
+def translateCached(value, fromLang, toLang):
+    preSpace, value, postSpace = splitSpacing(value)
+    cache = _getTrCache(fromLang, toLang)
+    got = cache.get(value)
     if got is None:
         got = _translate(value, fromLang, toLang)
         if enable_web_cache:
-            trCache[fromLang][toLang][value] = got
+            cache[value] = got
     return preSpace + got + postSpace
 
 
+def translateBatch(values, fromLang, toLang):
+    '''
+    Translate the values of all missing phrases together, so the
+    requests can run concurrently (See _translateList) instead of one
+    after another. Values that are already in trCache (or repeated)
+    are not sent.
+
+    Sequential arguments:
+    values -- Any strings (leading and trailing whitespace is ignored
+              the same way as in translateCached).
+    fromLang -- the language of the values
+    toLang -- the language to which to translate the values
+
+    Returns:
+    a dict where each key is a stripped value and each value is the
+    translation.
+    '''
+    cache = _getTrCache(fromLang, toLang)
+    results = {}
+    pending = []
+    for value in values:
+        value = value.strip()
+        if value in results:
+            continue
+        got = cache.get(value)
+        results[value] = got
+        if got is None:
+            pending.append(value)
+    if len(pending) < 1:
+        return results
+    echo0("INFO: translating {} chunk(s) (up to {} at a time)..."
+          "".format(len(pending), max_concurrent_requests))
+    if not enable_web_cache:
+        cache = None
+    for value, got in zip(pending, _translateList(pending, fromLang, toLang,
+                                                  cache=cache)):
+        results[value] = got
+    return results
+
+
+digits_re_str = r'\d+(?:_\d+)*'
+# ^ digits, allowing single underscores between them like int() does
+number_re = re.compile(
+    r'[+-]?(?:{d}(?:\.(?:{d})?)?|\.{d})(?:[eE][+-]?{d})?\Z'.format(
+        d=digits_re_str)
+)
+# ^ an int or float (Unlike float(), it doesn't match words such as
+#   "nan" or "Infinity", which should be translated).
+
+
 class DirtyHTML:
+    __slots__ = ('value', 'fmt')
     FMT_HTML = 'html'
     FMT_TEXT = 'text'
     FMT_CSS = 'css'
@@ -271,6 +471,11 @@ class ParseDirtyHTML:
     pretty much anything that requires the assumptions above.
     '''
 
+    __slots__ = ('_data', '_data_lower', '_i', '_start', '_in_fmt', 'path',
+                 'lineN', 'offset')
+    styleOpeners = ("<style ", "<style>")
+    styleCloser = "</style>"
+
     def __init__(self, data, path, lineN, offset):
         '''
         Sequential arguments:
@@ -282,6 +487,10 @@ class ParseDirtyHTML:
                   source code, only used for error messages.
         '''
         self._data = data
+        self._data_lower = data.replace("\u0130", "?").lower()
+        # ^ Lowercase it once for finding style tags. Replace the only
+        #   character ("\u0130") that becomes 2 characters when lowered
+        #   so indices in _data_lower are the same as in _data.
         self._i = 0  # This is the position in data.
         self._start = 0  # This is the start of the chunk.
         self._in_fmt = 'text'
@@ -412,17 +621,7 @@ class ParseDirtyHTML:
         '''
         # NOTE: If it starts with '-' or has '.' then
         # s.isnumeric() returns False!
-        s = s.strip()
-        try:
-            tmp = int(s)
-            return True
-        except ValueError:
-            try:
-                tmp = float(s)
-                return True
-            except ValueError:
-                return False
-        return False
+        return number_re.match(s.strip()) is not None
 
     @staticmethod
     def isDomainLike(s):
@@ -431,23 +630,65 @@ class ParseDirtyHTML:
         online domain name (has a '.' and has no spaces)
         '''
         s = s.strip()
-        if ParseDirtyHTML.isNumber(s):
-            return False
         if ' ' in s:
             return False
-        if '.' in s:
+        if '.' not in s:
+            return False
+        # ^ Check these before isNumber since they are faster.
+        if ParseDirtyHTML.isNumber(s):
+            return False
+        return True
+
+    @staticmethod
+    def isFormatting(s):
+        '''
+        Determine True or False: whether s is something that shouldn't
+        be translated, such as blank, an html entity, a path, an e-mail
+        address, a mention, a hashtag, money, punctuation, code, a
+        number or a domain name.
+        '''
+        s = s.strip()
+        if not s:
+            return True
+        if s.startswith("&") and s.endswith(";"):
+            return True
+        first = s[0]
+        if first in "/\\":
+            # ^ same as isSubdirectory
+            return True
+        if " " not in s:
+            # Only check the types that can't contain a space if there
+            # isn't one (most text to translate has one).
+            if first in "@#":
+                # ^ same as isMention and isHashtag
+                return True
+            if ParseDirtyHTML.isEmail(s):
+                return True
+            if ParseDirtyHTML.isDomainLike(s):
+                return True
+        if first == "$":
+            if ParseDirtyHTML.isMoney(s, "$", False):
+                return True
+        if ParseDirtyHTML.isPunctuation(s):
+            return True
+        if "=" in s:
+            if ParseDirtyHTML.isCodeSimpleAssignmentOp(s):
+                return True
+        if ParseDirtyHTML.isNumber(s):
             return True
         return False
 
     def __next__(self):
         data = self._data
-        styleOpeners = ["<style ", "<style>"]
-        styleCloser = "</style>"
         if self._i >= len(data):
             raise StopIteration
         while self._i < len(data):
             if self._in_fmt == DirtyHTML.FMT_HTML:
-                if data[self._i] == "<":
+                closeI = data.find(">", self._i)
+                endI = closeI if closeI > -1 else len(data)
+                openI = data.find("<", self._i, endI)
+                if openI > -1:
+                    self._i = openI
                     prefix = "{}:{}:{}: ".format(self.path, self.lineN,
                                                  self._i+self.offset)
                     msg = ("An opening bracket"
@@ -458,23 +699,27 @@ class ParseDirtyHTML:
                     # ^ Don't show the location using "SyntaxError",
                     #   since that would put "SyntaxError: " before it.
                     raise SyntaxError(msg)
-                if data[self._i] == ">":
-                    start = self._start
-                    self._i += 1
-                    self._start = self._i
-                    # ^ Get start after incrementing since closing.
-                    self._in_fmt = 'text'
-                    for styleOpener in styleOpeners:
-                        ender = start+len(styleOpener)
-                        if data[start:ender].lower() == styleOpener:
-                            self._in_fmt = 'css'
-                    return DirtyHTML(data[start:self._i],
-                                     DirtyHTML.FMT_HTML)
-                    # ^ Use the incremented _i since the character
-                    #   before it is the closer and is part of the
-                    #   html chunk.
+                if closeI < 0:
+                    self._i = len(data)
+                    break
+                start = self._start
+                self._i = closeI + 1
+                self._start = self._i
+                # ^ Get start after incrementing since closing.
+                self._in_fmt = 'text'
+                if self._data_lower.startswith(self.styleOpeners, start):
+                    self._in_fmt = 'css'
+                return DirtyHTML(data[start:self._i],
+                                 DirtyHTML.FMT_HTML)
+                # ^ Use the incremented _i since the character
+                #   before it is the closer and is part of the
+                #   html chunk.
             elif self._in_fmt == DirtyHTML.FMT_TEXT:
-                if data[self._i] == ">":
+                openI = data.find("<", self._i)
+                endI = openI if openI > -1 else len(data)
+                closeI = data.find(">", self._i, endI)
+                if closeI > -1:
+                    self._i = closeI
                     prefix = "{}:{}:{}: ".format(self.path, self.lineN,
                                                  self._i+self.offset)
                     msg = ("A closing bracket occurred"
@@ -485,38 +730,46 @@ class ParseDirtyHTML:
                     # ^ Don't show the location using "SyntaxError",
                     #   since that would put "SyntaxError: " before it.
                     raise SyntaxError(msg)
-                if data[self._i] == "<":
-                    self._in_fmt = 'html'
-                    if (self._i - self._start) > 0:
-                        start = self._start
-                        self._start = self._i
-                        # ^ Get start before incrementing since opening.
-                        self._i += 1
-                        return DirtyHTML(data[start:self._i-1],
-                                         DirtyHTML.FMT_TEXT)
-                        # ^ Use the previous start. Go back one since
-                        #   the new opener is not part of the previous
-                        #   non-html chunk.
-                    # else the string starts with a tag, so keep going
-                    # until there is something to return.
-            elif self._in_fmt == DirtyHTML.FMT_CSS:
-                ender = self._i+len(styleCloser)
-                if data[self._i:ender].lower() == styleCloser:
+                if openI < 0:
+                    self._i = len(data)
+                    break
+                self._i = openI
+                self._in_fmt = 'html'
+                if (self._i - self._start) > 0:
                     start = self._start
                     self._start = self._i
-                    # ^ Start the closing style tag at the '<'.
-                    self._in_fmt = DirtyHTML.FMT_HTML
+                    # ^ Get start before incrementing since opening.
                     self._i += 1
                     return DirtyHTML(data[start:self._i-1],
-                                     DirtyHTML.FMT_CSS)
-                    # ^ This is technically a closing of css even though
-                    #   it is an opening of html, so go back by -1
-                    #   to avoid capturing the '<' in styleCloser.
+                                     DirtyHTML.FMT_TEXT)
+                    # ^ Use the previous start. Go back one since
+                    #   the new opener is not part of the previous
+                    #   non-html chunk.
+                # else the string starts with a tag, so keep going
+                # until there is something to return.
+            elif self._in_fmt == DirtyHTML.FMT_CSS:
+                closeI = self._data_lower.find(self.styleCloser, self._i)
+                if closeI < 0:
+                    self._i = len(data)
+                    break
+                start = self._start
+                self._i = closeI
+                self._start = self._i
+                # ^ Start the closing style tag at the '<'.
+                self._in_fmt = DirtyHTML.FMT_HTML
+                self._i += 1
+                return DirtyHTML(data[start:self._i-1],
+                                 DirtyHTML.FMT_CSS)
+                # ^ This is technically a closing of css even though
+                #   it is an opening of html, so go back by -1
+                #   to avoid capturing the '<' in styleCloser.
             else:
                 raise RuntimeError("The parser is in an invalid state:"
                                    " self._in_fmt={}"
                                    "".format(value_to_py(self._in_fmt)))
             self._i += 1
+            # ^ Each state above jumps straight to the character it is
+            #   looking for, so this only runs for a tag at the start.
 
         start = self._start
         self._start = self._i
@@ -549,15 +802,25 @@ def value_to_py(v, q='"'):
         return "True"
     elif v is False:
         return "False"
-    try:
-        tmp = v.strip()
-        # ^ If there is no AttributeError, assume it is a string.
-        v = v.replace(q, "\\"+q)  # Escape the quotes.
-        return q + v + q
-    except AttributeError:
-        if isinstance(v, (int, float)):
-            return v
-        return repr(v)
+    elif isinstance(v, str):
+        return str_to_py(v, q=q)
+    elif isinstance(v, (int, float)):
+        return v
+    return repr(v)
+
+
+def str_to_py(s, q='"'):
+    '''
+    Convert a string to a Python string literal (This does the same as
+    value_to_py for a string, without checking the type).
+
+    Sequential arguments:
+    s -- any string
+
+    Keyword arguments:
+    q -- what quote mark to use on the value
+    '''
+    return q + s.replace(q, "\\"+q) + q
 
 
 def set_verbosity(v):
@@ -607,28 +870,43 @@ def usage():
     ))
 
 
-ignores = ["translations.php"]
+ignores = frozenset(["translations.php"])
+
+quoted_re_fmt = (r'''(?P<{q}>['"])'''
+                 r'''(?P<{name}>(?:\\.|(?!(?P={q}))[^\\])*)(?P={q})''')
+# ^ Format this with the group names for the quote and the quoted string.
+PHRASE_RE = re.compile(
+    r'\s*' + quoted_re_fmt.format(q='gQ', name='languagesKey')
+    + r'\s*\]\s*\[\s*' + quoted_re_fmt.format(q='lQ', name='lang')
+    + r'\s*\]\s*\[\s*' + quoted_re_fmt.format(q='kQ', name='key')
+    + r'\s*\]\s*(?P<sign>=)\s*'
+    + quoted_re_fmt.format(q='vQ', name='value')
+    + r'(?P<suffix>.*)'
+)
+# ^ This matches the rest of a translation line after the translations
+#   symbol such as "$GLOBALS[" (See JGALPack._parsePhrase), where each
+#   part may use single or double quotes and may contain escaped quotes.
 
 
 spacing_chars = " \t\n\r\f\v"
+non_spacing_re = re.compile("[^{}]".format(re.escape(spacing_chars)))
+# ^ Unlike r"\S", this only skips spacing_chars (not other Unicode
+#   spaces).
 
 
 def find_non_whitespace(haystack, start):
     '''
     Get the next non-whitespace character at or after start.
-    This function requires the global spacing_chars.
+    This function requires the global non_spacing_re.
 
     Sequential arguments:
     haystack -- Search this string.
     start -- Start at this index in haystack.
     '''
-    i = start
-
-    while i < len(haystack):
-        if haystack[i] not in spacing_chars:
-            return i
-        i += 1
-    return -1
+    m = non_spacing_re.search(haystack, start)
+    if m is None:
+        return -1
+    return m.start()
 
 
 def find_quoted_not_escaped(haystack, *args):
@@ -666,31 +944,35 @@ def find_quoted_not_escaped(haystack, *args):
     if len(args) == 1:
         start = args[0]
 
-    i = start
-    openQI = -1
-    closeQI = -1
-
-    enclosures = {}
-    enclosures["'"] = "'"
-    enclosures['"'] = '"'
-    closing = None
-    prevChar = ""
-
-    while i < len(haystack):
-        if closing is None:
-            if haystack[i] in enclosures.keys():
-                closing = enclosures[haystack[i]]
-                openQI = i
-        else:
-            if (haystack[i] == closing) and (prevChar != "\\"):
-                closeQI = i
-                return (openQI+1, closeQI, closing)
-        prevChar = haystack[i]
-        i += 1
+    singleQI = haystack.find("'", start)
+    doubleQI = haystack.find('"', start)
+    if singleQI < 0:
+        openQI = doubleQI
+    elif doubleQI < 0:
+        openQI = singleQI
+    else:
+        openQI = min(singleQI, doubleQI)
+    if openQI < 0:
+        return (-1, -1, None)
+    closing = haystack[openQI]
+    closeQI = haystack.find(closing, openQI+1)
+    while closeQI > -1:
+        slashI = closeQI - 1
+        while haystack[slashI] == "\\":
+            # ^ This stops at openQI at the latest (it is the quote).
+            slashI -= 1
+        if (closeQI - 1 - slashI) % 2 == 0:
+            # An even number of backslashes only escape each other.
+            return (openQI+1, closeQI, closing)
+        closeQI = haystack.find(closing, closeQI+1)
     return (openQI, -1, closing)
 
 
 class JGALPhraseBuilder:
+    __slots__ = ('lang', 'key', 'value', 'gQ', 'lQ', 'kQ', 'vQ', 'extras',
+                 'indent', 'suffix', 'globalsName', 'languagesKey',
+                 'langDotExt', 'lineN', 'vCol')
+
     def __init__(self):
         self.lineN = 0
         self.vCol = 0
@@ -703,6 +985,7 @@ class JGALPhrase:
     '''
     Track the context of a translated phrase within a code file.
     '''
+    __slots__ = JGALPhraseBuilder.__slots__
 
     def __init__(self, builder):
         '''
@@ -766,52 +1049,58 @@ class JGALPhrase:
         including the indent and the suffix (which would include a
         semicolon if the line in the original program did).
         '''
-        return (self.indent + self.globalsName + '[' + self.gQ +
-                self.languagesKey + self.gQ + ']['
-                + self.lQ + self.lang + self.lQ + ']['
-                + self.kQ + self.key + self.kQ + '] = '
-                + self.vToPy(self.value) + self.suffix)
+        return "".join((
+            self.indent, self.globalsName,
+            "[", self.gQ, self.languagesKey, self.gQ, "]",
+            "[", self.lQ, self.lang, self.lQ, "]",
+            "[", self.kQ, self.key, self.kQ, "] = ",
+            self.vToPy(self.value), self.suffix,
+        ))
+        # ^ join allocates the result once, unlike a chain of "+".
 
     def gToPy(self, s):
         '''
         Return a quoted and escaped version of s using
         this variable's line's translations global quote mark.
 
-        This method requires value_to_py.
+        This method requires str_to_py.
         '''
-        return value_to_py(str(s), q=self.gQ)
+        return str_to_py(str(s), q=self.gQ)
 
     def lToPy(self, s):
         '''
         Return a quoted and escaped version of s using
         this variable's line's quote mark that was around the language.
 
-        This method requires value_to_py.
+        This method requires str_to_py.
         '''
-        return value_to_py(str(s), q=self.lQ)
+        return str_to_py(str(s), q=self.lQ)
 
     def kToPy(self, s):
         '''
         Return a quoted and escaped version of s using
         this variable's line's quote mark that was around the key.
 
-        This method requires value_to_py.
+        This method requires str_to_py.
         '''
-        return value_to_py(str(s), q=self.kQ)
+        return str_to_py(str(s), q=self.kQ)
 
     def vToPy(self, s):
         '''
         Return a quoted and escaped version of s using
         this variable's line's quote mark that was around the key.
 
-        This method requires value_to_py.
+        This method requires str_to_py.
         '''
-        return value_to_py(str(s), q=self.vQ)
+        return str_to_py(str(s), q=self.vQ)
 
 
 class JGALPack:
 
     existingLangsWarn = True
+    langsPathFiles = {}
+    # ^ Each key is a langs path, and each value is a list of the names
+    #   of the files in it (See existingLangs).
     default_globalsName = '$GLOBALS'
     default_languagesKey = 'translations'
     default_langDotExt = ".php"
@@ -821,7 +1110,7 @@ class JGALPack:
         return os.path.join(self.langs_path, self.lang + self.dotExt)
 
     def __init__(self, langs_path, sub, lang, options,
-                 globalsName=None, languagesKey=None):
+                 globalsName=None, languagesKey=None, keys_only=False):
         '''
         Sequential arguments:
         langs_path -- This must contain the language file named sub.
@@ -846,6 +1135,9 @@ class JGALPack:
                        as $GLOBALS
         languagesKey -- the key in the globals that accesses the
                            entire translations associative array
+        keys_only -- Only collect the keys (each value in phrases will
+                     be None), such as to find out which keys the
+                     target language already has.
         '''
         newExt = options.get('extension')
         if newExt is None:
@@ -872,7 +1164,8 @@ class JGALPack:
                   "".format(languagesKey))
         self.languagesKey = languagesKey
         self.phrases = {}
-        self.keys = []  # This list exists to keep the keys in order.
+        # ^ The keys stay in the order of the file since dicts keep
+        #   insertion order (Python 3.7+).
         translationsSymbol = "{}[".format(globalsName)
         # The full opening is: translationsSymbol
         #                      + "['"+languagesKey+"']"
@@ -902,218 +1195,320 @@ class JGALPack:
         self.lang = lang
         count = 0
         lineN = 0
-        CO = JGALPack.CO
-        with open(self.path) as ins:
-            extras = []
-            for rawL in ins:
-                lineN += 1
-                line = rawL.strip()
-                spacingLen = len(line) - len(line.lstrip())
-                indent = line[:spacingLen]
-                inLine = line.rstrip("\n\r\f")
-                if not line.startswith(translationsSymbol):
-                    echo1("[verbose] Doesn't start with \"{}\": \"{}\""
-                          "".format(translationsSymbol, line))
-                    extras.append(inLine)
-                    continue
+        with open(self.path, 'r', encoding='utf-8') as ins:
+            data = ins.read()
+            # ^ Read it at once (See symbolLineRe below). Use utf-8
+            #   since the default encoding on Windows can't read most
+            #   non-English language files.
+        symbolLineRe = re.compile(
+            r'^(?P<indent>[^\S\n]*)' + re.escape(translationsSymbol)
+            + r'.*$',
+            re.MULTILINE,
+        )
+        # ^ Find only the lines that may be phrases, so other lines are
+        #   never handled one at a time by Python code.
+        extras = None
+        # ^ lines that are not phrases before the next phrase
+        nextStart = 0
+        # ^ the start of the line after the previous symbol line
+        parsePhrase = self._parsePhrase
+        phrases = self.phrases
+        # ^ Look these up once instead of once per line.
+        verbose = verbosity > 0
+        indents = {}
+        # ^ Share one string for each distinct indent (There are only a
+        #   few in a file).
+        for m in symbolLineRe.finditer(data):
+            rawLine = m.group(0)
+            start, end = m.span()
+            if keys_only:
+                lineN += data.count("\n", nextStart, start) + 1
+                nextStart = end + 1
                 count += 1
-                preGlobalI = len(translationsSymbol)
-
-                gFound = find_quoted_not_escaped(line, preGlobalI)
-                # ^ The global key in globals may be found at this slice
-                #   using quote gFound[2].
-                if gFound[1] < 0:
-                    if gFound[0] > -1:
-                        echo0("{}:{}:{}: The closing {} around the"
-                              " translations key after the opening"
-                              " {} was missing."
-                              "".format(self.path, lineN, gFound[0]+CO,
-                                        gFound[2], line[gFound[0]-1]))
-                    extras.append(inLine)
-                    continue
-
-                debugStr = line[gFound[0]:gFound[1]]
-                if debugStr != languagesKey:
-                    echo0("{}:{}:{}: WARNING: expected"
-                          " the key {} in {}."
-                          "".format(self.path, lineN, kFound[0]+CO,
-                                    languagesKey,
-                                    translationsSymbol))
-                    extras.append(inLine)
-                    continue
-                firstCBI = find_non_whitespace(line, gFound[1]+1)
-                # ^ the first closing bracket's index
-                # if line[firstCBI] != "]":
-                if (firstCBI < 0) or (line[firstCBI] != "]"):
-                    echo0("{}:{}:{}: A closing bracket is expected"
-                          "after the quoted translations key."
-                          "".format(self.path, lineN, gFound[1]+1+CO))
-                    extras.append(inLine)
-                    continue
-                preLangI = firstCBI + 1
-                if (preLangI >= len(line)) or (line[preLangI] != "["):
-                    echo0("{}:{}:{}: An opening bracket is expected"
-                          " after the close bracket after"
-                          " the translations key."
-                          "".format(self.path, lineN, preLangI+CO))
-                    extras.append(inLine)
-                    continue
-
-                lFound = find_quoted_not_escaped(line, preLangI)
-
-                if lFound[1] < 0:
-                    if lFound[0] > -1:
-                        echo0("{}:{}:{}: WARNING: The closing {}"
-                              " around the language after the opening"
-                              " {} was missing. Maybe it is the"
-                              " declaration of {}['{}']"
-                              "".format(self.path, lineN, lFound[0]+CO,
-                                        lFound[2], line[lFound[0]-1],
-                                        translationsSymbol,
-                                        languagesKey))
-                    extras.append(inLine)
-                    continue
-                debugLang = line[lFound[0]:lFound[1]]
-                if debugLang != lang:
-                    echo0("{}:{}:{}: ERROR: The lang '{}' was expected"
-                          " but the line specifies '{}'."
-                          "".format(self.path, lineN, lFound[0]+CO,
-                                    lang,
-                                    debugLang))
-                    extras.append(inLine)
-                    continue
-
-                keyCBI = find_non_whitespace(line, lFound[1]+1)
-                if (keyCBI < 0) or (line[keyCBI] != "]"):
-                    echo0("{}:{}:{}: A closing bracket is expected"
-                          "after the quoted language."
-                          "".format(self.path, lineN, lFound[1]+1+CO))
-                    extras.append(inLine)
-                    continue
-
-                preKeyI = keyCBI + 1
-
-                kFound = find_quoted_not_escaped(line, preKeyI)
-                # ^ The key may be found at this slice
-                #   using quote kFound[2].
-                if kFound[1] < 0:
-                    if kFound[0] > -1:
-                        echo0("{}:{}:{}: WARNING: The closing {}"
-                              " around the key after the opening"
-                              " {} was missing. Maybe it is the"
-                              " declaration of {}['{}']"
-                              "".format(self.path, lineN, kFound[0]+CO,
-                                        kFound[2], line[kFound[0]-1],
-                                        translationsSymbol,
-                                        languagesKey))
-                    extras.append(inLine)
-                    continue
-
-                key = line[kFound[0]:kFound[1]]
-                # echo1("key:{}".format(key))
-                # ^ The value of key is now "some_key" excluding quotes.
-                keyQ = kFound[2]
-                closeBI = find_non_whitespace(line, kFound[1] + 1)
-                # ^ closeBI is the closing bracket's index for
-                #   The key.
-                # if kFound[1] + 3 >= len(line):
-                if closeBI < 0:
-                    echo0("{}:{}:{}: The line ended after the key"
-                          " but before the value."
-                          "".format(self.path, lineN, kFound[1]+CO))
-                if line[closeBI] != "]":
-                    echo0("{}:{}:{}: A closing bracket was expected."
-                          "".format(self.path, lineN, closeBI+CO))
-                signI = find_non_whitespace(line, closeBI+1)
-                # if (closeBI+1>=len(line)) or (line[closeBI+1] != "="):
-                if (signI < 0) or (line[signI] != "="):
-                    echo0("{}:{}:{}: '=' was expected after ']'"
-                          " but got \"{}\"."
-                          "".format(self.path, lineN, closeBI+1+CO,
-                                    line[closeBI+1:]))
-                vFound = find_quoted_not_escaped(line, signI+1)
-                if vFound[1] < 0:
-                    if vFound[0] > -1:
-                        echo0("{}:{}:{}: The closing {}"
-                              " around the value after the opening"
-                              " {} was missing."
-                              "".format(self.path, lineN, signI+1+CO,
-                                        vFound[2], line[vFound[0]]))
-                        extras.append(inLine)
-                        continue
-                    echo0("{}:{}:{}: The opening quote"
-                          " for the value after "
-                          " '{}' was missing."
-                          "".format(self.path, lineN, signI+1+CO,
-                                    line[signI]))
-                    extras.append(inLine)
-                    continue
-                rawV = line[vFound[0]:vFound[1]]
-                value = rawV.replace("\\"+vFound[2], vFound[2])
-                echo1("{}:{}:{}: [verbose] got: ['{}']['{}']['{}']={}"
-                      "".format(self.path, lineN, signI+CO,
-                                debugStr, debugLang, key,
-                                value_to_py(value, q="'")))
-                suffix = ""
-                lastCBI = find_non_whitespace(line, vFound[1]+1)
-                if lastCBI > -1:
-                    suffix = line[lastCBI+1:]
-                else:
-                    echo0("{}:{}:{}: ']' was expected after the key"
-                          " (lastCBI={}, line=\"{}\")."
-                          "".format(self.path, lineN, vFound[1]+1+CO,
-                                    lastCBI, line))
-                # ^ the last closing bracket's index
-                builder = JGALPhraseBuilder()
-                builder.lang = debugLang
-                builder.key = key
-                builder.value = value
-                builder.gQ = gFound[2]
-                builder.lQ = lFound[2]
-                builder.kQ = kFound[2]
-                builder.vQ = vFound[2]
-                builder.extras = extras
-                builder.indent = indent
-                builder.suffix = suffix
-                builder.globalsName = self.globalsName
-                builder.languagesKey = self.languagesKey
-                builder.langDotExt = self.dotExt
-                builder.lineN = lineN
-                builder.vCol = vFound[0] + CO
-                phrase = builder.build()
-
-                self.phrases[key] = phrase
-                self.keys.append(key)
-                extras = []
-                indent = None
-                suffix = None
+                builder = parsePhrase(rawLine.strip(), lineN,
+                                      translationsSymbol)
+                if builder is not None:
+                    phrases[builder.key] = None
+                continue
+            gapLines = data[nextStart:start].split("\n")
+            gapLines.pop()
+            # ^ whole lines including indentation (The last element is
+            #   "" since m is at the start of a line).
+            lineN += len(gapLines) + 1
+            nextStart = end + 1
+            if extras:
+                extras += gapLines
+            else:
+                extras = gapLines
+                # ^ Use the list as is (most phrases only have the lines
+                #   since the previous phrase).
+            if verbose:
+                for gapLine in gapLines:
+                    echo1("[verbose] Doesn't start with \"{}\": \"{}\""
+                          "".format(translationsSymbol, gapLine))
+            count += 1
+            builder = parsePhrase(rawLine.strip(), lineN,
+                                  translationsSymbol)
+            if builder is None:
+                extras.append(rawLine)
+                continue
+            builder.extras = extras
+            indent = m.group('indent')
+            builder.indent = indents.setdefault(indent, indent)
+            phrase = builder.build()
+
+            phrases[phrase.key] = phrase
+            extras = None
+        # Lines after the last phrase are not kept since no phrase
+        # can use them as extras.
 
         echo0("INFO: JGALPack init processed {} line(s)"
               " in \"{}\" that started with \"{}\" and got"
               " {} phrase(s)"
               "".format(count, self.path, translationsSymbol,
-                        len(self.keys)))
+                        len(phrases)))
+
+    def _newBuilder(self, lineN):
+        builder = JGALPhraseBuilder()
+        builder.globalsName = self.globalsName
+        builder.languagesKey = self.languagesKey
+        builder.langDotExt = self.dotExt
+        builder.lineN = lineN
+        return builder
+
+    def _parsePhrase(self, line, lineN, translationsSymbol):
+        '''
+        Parse a stripped line that starts with translationsSymbol using
+        PHRASE_RE. Only if that doesn't match, parse it again using
+        _parsePhraseSlow to show what is wrong with the line.
+
+        Returns:
+        a JGALPhraseBuilder with all members set except extras and
+        indent, or None if the line is not a phrase in this language.
+        '''
+        m = PHRASE_RE.match(line, len(translationsSymbol))
+        if m is None:
+            return self._parsePhraseSlow(line, lineN, translationsSymbol)
+        languagesKey, lang, gQ, lQ, kQ, key, vQ, rawV, suffix = m.group(
+            'languagesKey', 'lang', 'gQ', 'lQ', 'kQ', 'key', 'vQ', 'value',
+            'suffix')
+        if (languagesKey != self.languagesKey) or (lang != self.lang):
+            return self._parsePhraseSlow(line, lineN, translationsSymbol)
+        value = rawV.replace("\\"+vQ, vQ)
+        vCol = m.start('value') + JGALPack.CO
+        if verbosity > 0:
+            # ^ Check first to skip formatting the message (This runs
+            #   for every phrase).
+            echo1("{}:{}:{}: [verbose] got: ['{}']['{}']['{}']={}"
+                  "".format(self.path, lineN,
+                            m.start('sign') + JGALPack.CO,
+                            languagesKey, lang, key,
+                            value_to_py(value, q="'")))
+        builder = self._newBuilder(lineN)
+        builder.lang = self.lang
+        # ^ Share one string for every phrase (It equals lang).
+        builder.key = sys.intern(key)
+        # ^ Intern keys so the same key from the other language's file
+        #   is the same object, making lookups by key faster.
+        builder.value = value
+        builder.gQ = gQ
+        builder.lQ = lQ
+        builder.kQ = kQ
+        builder.vQ = vQ
+        builder.suffix = suffix
+        builder.vCol = vCol
+        return builder
+
+    def _parsePhraseSlow(self, line, lineN, translationsSymbol):
+        '''
+        Parse a stripped line that starts with translationsSymbol one
+        part at a time and show an error for the first part that is
+        wrong. See _parsePhrase for the return value.
+        '''
+        CO = JGALPack.CO
+        languagesKey = self.languagesKey
+        lang = self.lang
+        preGlobalI = len(translationsSymbol)
+
+        gFound = find_quoted_not_escaped(line, preGlobalI)
+        # ^ The global key in globals may be found at this slice
+        #   using quote gFound[2].
+        if gFound[1] < 0:
+            if gFound[0] > -1:
+                echo0("{}:{}:{}: The closing {} around the"
+                      " translations key after the opening"
+                      " {} was missing."
+                      "".format(self.path, lineN, gFound[0]+CO,
+                                gFound[2], line[gFound[0]-1]))
+            return None
+
+        debugStr = line[gFound[0]:gFound[1]]
+        if debugStr != languagesKey:
+            echo0("{}:{}:{}: WARNING: expected"
+                  " the key {} in {}."
+                  "".format(self.path, lineN, gFound[0]+CO,
+                            languagesKey,
+                            translationsSymbol))
+            return None
+        firstCBI = find_non_whitespace(line, gFound[1]+1)
+        # ^ the first closing bracket's index
+        # if line[firstCBI] != "]":
+        if (firstCBI < 0) or (line[firstCBI] != "]"):
+            echo0("{}:{}:{}: A closing bracket is expected"
+                  "after the quoted translations key."
+                  "".format(self.path, lineN, gFound[1]+1+CO))
+            return None
+        preLangI = firstCBI + 1
+        if (preLangI >= len(line)) or (line[preLangI] != "["):
+            echo0("{}:{}:{}: An opening bracket is expected"
+                  " after the close bracket after"
+                  " the translations key."
+                  "".format(self.path, lineN, preLangI+CO))
+            return None
+
+        lFound = find_quoted_not_escaped(line, preLangI)
+
+        if lFound[1] < 0:
+            if lFound[0] > -1:
+                echo0("{}:{}:{}: WARNING: The closing {}"
+                      " around the language after the opening"
+                      " {} was missing. Maybe it is the"
+                      " declaration of {}['{}']"
+                      "".format(self.path, lineN, lFound[0]+CO,
+                                lFound[2], line[lFound[0]-1],
+                                translationsSymbol,
+                                languagesKey))
+            return None
+        debugLang = line[lFound[0]:lFound[1]]
+        if debugLang != lang:
+            echo0("{}:{}:{}: ERROR: The lang '{}' was expected"
+                  " but the line specifies '{}'."
+                  "".format(self.path, lineN, lFound[0]+CO,
+                            lang,
+                            debugLang))
+            return None
+
+        keyCBI = find_non_whitespace(line, lFound[1]+1)
+        if (keyCBI < 0) or (line[keyCBI] != "]"):
+            echo0("{}:{}:{}: A closing bracket is expected"
+                  "after the quoted language."
+                  "".format(self.path, lineN, lFound[1]+1+CO))
+            return None
+
+        preKeyI = keyCBI + 1
+
+        kFound = find_quoted_not_escaped(line, preKeyI)
+        # ^ The key may be found at this slice
+        #   using quote kFound[2].
+        if kFound[1] < 0:
+            if kFound[0] > -1:
+                echo0("{}:{}:{}: WARNING: The closing {}"
+                      " around the key after the opening"
+                      " {} was missing. Maybe it is the"
+                      " declaration of {}['{}']"
+                      "".format(self.path, lineN, kFound[0]+CO,
+                                kFound[2], line[kFound[0]-1],
+                                translationsSymbol,
+                                languagesKey))
+            return None
+
+        key = line[kFound[0]:kFound[1]]
+        # echo1("key:{}".format(key))
+        # ^ The value of key is now "some_key" excluding quotes.
+        closeBI = find_non_whitespace(line, kFound[1] + 1)
+        # ^ closeBI is the closing bracket's index for
+        #   The key.
+        # if kFound[1] + 3 >= len(line):
+        if closeBI < 0:
+            echo0("{}:{}:{}: The line ended after the key"
+                  " but before the value."
+                  "".format(self.path, lineN, kFound[1]+CO))
+        if line[closeBI] != "]":
+            echo0("{}:{}:{}: A closing bracket was expected."
+                  "".format(self.path, lineN, closeBI+CO))
+        signI = find_non_whitespace(line, closeBI+1)
+        # if (closeBI+1>=len(line)) or (line[closeBI+1] != "="):
+        if (signI < 0) or (line[signI] != "="):
+            echo0("{}:{}:{}: '=' was expected after ']'"
+                  " but got \"{}\"."
+                  "".format(self.path, lineN, closeBI+1+CO,
+                            line[closeBI+1:]))
+        vFound = find_quoted_not_escaped(line, signI+1)
+        if vFound[1] < 0:
+            if vFound[0] > -1:
+                echo0("{}:{}:{}: The closing {}"
+                      " around the value after the opening"
+                      " {} was missing."
+                      "".format(self.path, lineN, signI+1+CO,
+                                vFound[2], line[vFound[0]]))
+                return None
+            echo0("{}:{}:{}: The opening quote"
+                  " for the value after "
+                  " '{}' was missing."
+                  "".format(self.path, lineN, signI+1+CO,
+                            line[signI]))
+            return None
+        rawV = line[vFound[0]:vFound[1]]
+        value = rawV.replace("\\"+vFound[2], vFound[2])
+        if verbosity > 0:
+            echo1("{}:{}:{}: [verbose] got: ['{}']['{}']['{}']={}"
+                  "".format(self.path, lineN, signI+CO,
+                            debugStr, debugLang, key,
+                            value_to_py(value, q="'")))
+        builder = self._newBuilder(lineN)
+        builder.lang = debugLang
+        builder.key = sys.intern(key)
+        builder.value = value
+        builder.gQ = gFound[2]
+        builder.lQ = lFound[2]
+        builder.kQ = kFound[2]
+        builder.vQ = vFound[2]
+        builder.suffix = line[vFound[1]+1:]
+        # ^ Keep everything after the closing quote (such as a
+        #   semicolon and a comment).
+        builder.vCol = vFound[0] + CO
+        return builder
 
     @classmethod
-    def existingLangs(cls, langDotExt, ignore_langs=None):
-        dirs = list(os.listdir(langsPath))
+    def existingLangs(cls, langDotExt, ignore_langs=None, refresh=False):
+        '''
+        List the languages that have a file in langsPath.
+
+        Sequential arguments:
+        langDotExt -- the extension (including the dot) of language
+                      files
+
+        Keyword arguments:
+        ignore_langs -- file names to skip
+        refresh -- List langsPath again even if it was listed before
+                   (otherwise the previous list of files is reused).
+        '''
+        files = cls.langsPathFiles.get(langsPath)
+        if (files is None) or refresh:
+            with os.scandir(langsPath) as entries:
+                files = [entry.name for entry in entries
+                         if entry.is_file()]
+                # ^ is_file uses the type from the directory listing
+                #   (It doesn't need another stat call on most systems).
+            cls.langsPathFiles[langsPath] = files
+        if ignore_langs is None:
+            ignore_langs = ()
+        ignore_langs = frozenset(ignore_langs)
         langs = []
-        for d in dirs:
-            dPath = os.path.join(langsPath, d)
-            if not os.path.isfile(dPath):
-                continue
+        lowerDotExt = langDotExt.lower()
+        extLen = len(langDotExt)
+        for d in files:
             if d in ignores:
                 continue
-            if not d.lower().endswith(langDotExt.lower()):
+            if d[-extLen:].lower() != lowerDotExt:
                 if cls.existingLangsWarn:
-                    print("WARNING: list langs ignored the file \"{}\""
+                    echo0("WARNING: list langs ignored the file \"{}\""
                           " since it is not a {} file."
                           "".format(d, langDotExt))
                 continue
-            if ignore_langs is not None:
-                if d in ignore_langs:
-                    continue
-            langs.append(d[:-len(langDotExt)])
+            if d in ignore_langs:
+                continue
+            langs.append(d[:-extLen])
         cls.existingLangsWarn = False
         return langs
 
@@ -1168,7 +1563,7 @@ def main():
     nextLang = None
     langDotExt = JGALPack.default_langDotExt
     options = {}
-    booleans = []
+    booleans = ["verbose"]
     argName = None
     i = 1
     while i < len(sys.argv):
@@ -1177,9 +1572,14 @@ def main():
             options[argName] = arg
             argName = None
         elif arg.startswith("--"):
-            argName = arg[2:]
+            if arg[2:] in booleans:
+                options[arg[2:]] = True
+            else:
+                argName = arg[2:]
         i += 1
     echo0("* using options: {}".format(options))
+    if options.get('verbose') is True:
+        set_verbosity(True)
     newFrom = options.get('from')
     if newFrom is not None:
         origLang = newFrom
@@ -1205,7 +1605,8 @@ def main():
               "".format(origLangSub))
     origLangPath = os.path.join(langsPath, origLangSub)
     if nextLang == origLang:
-        langs = existingLangs([origLangSub], langDotExt)
+        langs = JGALPack.existingLangs(langDotExt,
+                                       ignore_langs=[origLangSub])
         usage()
         echo0("")
         raise ValueError("You must specify a language to check, but"
@@ -1234,6 +1635,15 @@ def main():
                          " langDotExt={})"
                          "".format(origLangPath, origLang,
                                    langDotExt))
+    for lang in (origLang, nextLang):
+        if not isTranslatorLang(lang):
+            usage()
+            echo0("")
+            raise ValueError("Error: Google Translate doesn't have the"
+                             " language \"{}\". Use a code from"
+                             " googletrans.LANGUAGES (listed at the"
+                             " top of the output) as the file name."
+                             "".format(lang))
 
     # for nextSub in os.listdir(langsPath):
     #     nextPath = os.path.join(langsPath, nextSub)
@@ -1254,78 +1664,79 @@ def main():
         nextLang = nextSub[:-len(langDotExt)]
 
     echo0("INFO: analyzing \"{}\"...".format(nextPath))
-    nextPack = JGALPack(langsPath, nextSub, nextLang, options)
+    nextPack = JGALPack(langsPath, nextSub, nextLang, options,
+                        keys_only=True)
     echo0("INFO: analyzing \"{}\"...".format(origLangPath))
     origPack = JGALPack(langsPath, origLangSub, origLang, options)
     newCount = 0
-    for key in origPack.keys:
-        # ^ Keys is a list (origPack is an object not a dict).
-        nextPhrase = nextPack.phrases.get(key)
-        # ^ See if the original language key is in the target language.
-        if nextPhrase is not None:
+    missing = []
+    # ^ Each entry is a phrase and its chunks, where each chunk is a
+    #   tuple of (chunk, tmp, escapeQ, formatting) and tmp is the
+    #   unescaped text to translate (None if chunk is not text).
+    toTranslate = []
+    for key, origPhrase in origPack.phrases.items():
+        if key in nextPack.phrases:
             # It already is in the target.
             continue
-        # nextPhrase is None, so generate it through translation.
-        origPhrase = origPack.phrases[key]
+        # The key is not in the target, so generate it through
+        # translation.
         # echo1("*translate phrase* {}".format(origPhrase.value))
-        nextValue = ""
-        for chunk in ParseDirtyHTML(origPhrase.value,
-                                    origPack.getPath(),
-                                    origPhrase.lineN,
-                                    origPhrase.vCol):
+        chunks = []
+        value = origPhrase.value
+        if "<" not in value and ">" not in value:
+            # Without brackets ParseDirtyHTML would only yield the
+            # whole value as one text chunk (or nothing if empty).
+            htmlChunks = (DirtyHTML(value, DirtyHTML.FMT_TEXT),)
+            if not value:
+                htmlChunks = ()
+        else:
+            htmlChunks = ParseDirtyHTML(value, origPack.getPath(),
+                                        origPhrase.lineN, origPhrase.vCol)
+        for chunk in htmlChunks:
             if chunk.fmt != DirtyHTML.FMT_TEXT:
-                nextValue += chunk.value
-            else:
-                escapeQ = None
-                tmp = chunk.value
-                if "\\\"" in tmp:
-                    escapeQ = '"'
-                elif "\\'" in tmp:
-                    escapeQ = "'"
-                if escapeQ is not None:
-                    tmp = tmp.replace("\\" + escapeQ, escapeQ)
-                tmp = unescape_only(tmp, "\\n")
-                formatting = False
-                tmpStrip = tmp.strip()
-                if len(tmpStrip) < 1:
-                    formatting = True
-                elif (tmpStrip.startswith("&")
-                      and tmpStrip.endswith(";")):
-                    formatting = True
-                elif ParseDirtyHTML.isSubdirectory(tmpStrip):
-                    formatting = True
-                elif ParseDirtyHTML.isEmail(tmpStrip):
-                    formatting = True
-                elif ParseDirtyHTML.isMention(tmpStrip):
-                    formatting = True
-                elif ParseDirtyHTML.isHashtag(tmpStrip):
-                    formatting = True
-                elif ParseDirtyHTML.isMoney(tmpStrip, "$", False):
-                    formatting = True
-                elif ParseDirtyHTML.isPunctuation(tmpStrip):
-                    formatting = True
-                elif ParseDirtyHTML.isCodeSimpleAssignmentOp(tmpStrip):
-                    formatting = True
-                elif ParseDirtyHTML.isNumber(tmpStrip):
-                    formatting = True
-                elif ParseDirtyHTML.isDomainLike(tmpStrip):
-                    formatting = True
-                if not formatting:
-                    tmp = translateCached(tmp, origLang, nextLang)
-                    # echo1("  *translate chunk* " + tmp)
-                tmp = escape_only(tmp, "\\n")
-                if escapeQ is not None:
-                    tmp = tmp.replace(escapeQ, "\\" + escapeQ)
-                nextValue += tmp
+                chunks.append((chunk, None, None, True))
+                continue
+            escapeQ = None
+            tmp = chunk.value
+            if "\\\"" in tmp:
+                escapeQ = '"'
+            elif "\\'" in tmp:
+                escapeQ = "'"
+            if escapeQ is not None:
+                tmp = tmp.replace("\\" + escapeQ, escapeQ)
+            tmp = unescape_only(tmp, "\\n")
+            formatting = ParseDirtyHTML.isFormatting(tmp)
+            if not formatting:
+                toTranslate.append(tmp)
+            chunks.append((chunk, tmp, escapeQ, formatting))
+        missing.append((origPhrase, chunks))
+
+    atexit.register(saveTrCache)
+    # ^ Save even if translating or printing fails partway through
+    #   (_translateAsync caches each translation as soon as it arrives).
+    translated = translateBatch(toTranslate, origLang, nextLang)
+
+    for origPhrase, chunks in missing:
+        parts = []
+        for chunk, tmp, escapeQ, formatting in chunks:
+            if tmp is None:
+                parts.append(chunk.value)
+                continue
+            if not formatting:
+                preSpace, tmp, postSpace = splitSpacing(tmp)
+                tmp = preSpace + translated[tmp] + postSpace
+                # echo1("  *translate chunk* " + tmp)
+            tmp = escape_only(tmp, "\\n")
+            if escapeQ is not None:
+                tmp = tmp.replace(escapeQ, "\\" + escapeQ)
+            parts.append(tmp)
+        nextValue = "".join(parts)
         # NOTE: If *translated chunk* does NOT appear above for
         #       any words in the phrase below, then all of the
         #       chunks were (or the singular chunk if no html tags
         #       were present was) determined to be formatting and
         #       not actually translated.
         echo1("    *translated phrase* " + nextValue)
-        gQ = origPhrase.gQ
-        lQ = origPhrase.lQ
-        kQ = origPhrase.kQ
 
         for extra in origPhrase.extras:
             print(extra)
@@ -1333,9 +1744,6 @@ def main():
         newCount += 1
         print(nextPhrase.toCode())
 
-    with open(trCachePath, 'w') as outs:
-        json.dump(trCache, outs, sort_keys=True, indent=2)
-    echo0("INFO: The cache was saved to \"{}\"".format(trCachePath))
     if newCount > 0:
         echo0("INFO: {} printed in this session"
               " based on the original language \"{}\""
@@ -1343,8 +1751,7 @@ def main():
               " so you will have to paste them into the file."
               "".format(newCount, origLang, nextPack.getPath()))
     else:
-        origCount = len(origPack.keys)
-        # ^ Keys is a list (origPack is an object not a dict).
+        origCount = len(origPack.phrases)
         echo0("INFO: All {} keys from the original language file \"{}\""
               " are in \"{}\" (There is nothing to do)."
               "".format(origCount, origPack.getPath(),